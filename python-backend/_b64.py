@@ -0,0 +1,17 @@
+"""Shared base64 decoding for image payloads.
+
+Uses pybase64 (SIMD-accelerated libbase64) when installed and falls back to
+the standard library decoder otherwise.
+"""
+
+try:
+    import pybase64 as _base64
+    DECODER = f"pybase64 {_base64.get_version()}"
+except ImportError:
+    import base64 as _base64
+    DECODER = "stdlib base64"
+
+
+def b64decode(data) -> bytes:
+    """Decode base64 data, skipping whitespace and other non-alphabet characters"""
+    return _base64.b64decode(data, validate=False)
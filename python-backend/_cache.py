@@ -0,0 +1,70 @@
+"""Content-addressed result caching for image analysis.
+
+Clients retrying a request resend the exact same payload, so results are
+keyed by a 128-bit digest of the raw image data. BLAKE3 is used when
+installed, falling back to hashlib's BLAKE2b.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+try:
+    from blake3 import blake3 as _hasher
+except ImportError:
+    import hashlib
+    
+    def _hasher(data: bytes):
+        return hashlib.blake2b(data, digest_size=16)
+
+
+def content_digest(image_data: Union[str, bytes]) -> bytes:
+    """128-bit digest of base64 text or raw image bytes"""
+    if isinstance(image_data, str):
+        image_data = image_data.encode()
+    return _hasher(image_data).digest()[:16]
+
+
+class ResultCache:
+    """Thread-safe LRU cache of analysis results keyed by content digest"""
+    
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Return a copy of the cached result, or None"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers are free to modify what they get back
+        return copy.deepcopy(result)
+    
+    def put(self, key: bytes, result: Dict):
+        """Store a result, evicting the least recently used one when full"""
+        if self.maxsize <= 0:
+            return
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters for the health endpoint"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,33 @@
+"""Process-wide thread pools for the analysis engines.
+
+Pools are created on first use rather than at import, so a gunicorn master
+that imports the app before forking never starts threads, and are dropped
+in forked children, whose copy would reference threads that no longer
+exist.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class LazyExecutor:
+    """ThreadPoolExecutor created on first submit and rebuilt after fork"""
+    
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+    
+    def _reset(self):
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=self.thread_name_prefix)
+        return self._executor.submit(fn, *args, **kwargs)
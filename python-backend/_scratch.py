@@ -0,0 +1,23 @@
+"""Per-thread scratch buffers for image analysis.
+
+OpenCV writes into a preallocated ``dst`` when one of the right shape is
+passed, so each thread keeps one uint8 buffer per name and reuses it across
+requests of the same image size. A buffer is only valid until the same
+thread asks for the same name again, so results must never keep a
+reference to one.
+"""
+
+import threading
+
+import numpy as np
+
+_local = threading.local()
+
+
+def scratch_buffer(name: str, shape) -> np.ndarray:
+    """Per-thread uint8 buffer reused across requests of the same image size"""
+    buffer = getattr(_local, name, None)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.uint8)
+        setattr(_local, name, buffer)
+    return buffer
@@ -1,51 +1,164 @@
-import pytesseract
 import easyocr
+import torch
 import cv2
 import numpy as np
 from PIL import Image
 import re
-import base64
 import io
+import os
+import platform
 import logging
-from typing import Dict, List, Optional
+import functools
+import threading
+from typing import Dict, List, Optional, Union
+
+from _b64 import b64decode
+from _cache import ResultCache, content_digest
+from _pool import LazyExecutor
+from _scratch import scratch_buffer
+
+try:
+    # In-process libtesseract bindings: the model stays loaded between calls
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+except ImportError:
+    # Fall back to the CLI wrapper, which spawns a tesseract process per call
+    PyTessBaseAPI = None
+    import pytesseract
 
 logger = logging.getLogger(__name__)
 
+try:
+    # Direct libjpeg-turbo bindings for the common JPEG screenshot case
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbojpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    # Module missing or libturbojpeg not found: cv2.imdecode handles JPEG too
+    _turbojpeg = None
+
+# Trading signal patterns, matched case-insensitively against the raw OCR text
+_SIGNAL_PATTERNS = {
+    # Anchored at word starts so long runs of OCR noise cannot backtrack quadratically
+    "standard": re.compile(r'\b(\w+)\s+(buy|sell|long|short)\s+(?:at\s+)?(\d+\.?\d*)[,\s]*(?:sl|stop|stoploss)[\s:]*(\d+\.?\d*)[,\s]*(?:tp|target|takeprofit)[\s:]*(\d+\.?\d*)', re.IGNORECASE),
+    "price_first": re.compile(r'(?:entry|open)[\s:]*(\d+\.?\d*)[,\s]*(?:sl|stop)[\s:]*(\d+\.?\d*)[,\s]*(?:tp|target)[\s:]*(\d+\.?\d*)', re.IGNORECASE),
+    "symbol_action": re.compile(r'(eth|btc|bitcoin|ethereum)\s+(short|long|buy|sell)', re.IGNORECASE),
+    # Gaps are bounded for the same reason
+    "price_levels": re.compile(r'(\d+\.?\d+).{0,40}?(\d+\.?\d+).{0,40}?(\d+\.?\d+)', re.IGNORECASE)
+}
+
+# Run EasyOCR and Tesseract concurrently; disable on 1-2 core boxes where the
+# engines would only contend for the same cores
+OCR_PARALLEL = os.getenv('OCR_PARALLEL', 'true').lower() == 'true'
+_ocr_pool = LazyExecutor(max_workers=2, thread_name_prefix='ocr')
+
+# Skip Tesseract when EasyOCR reads at least this many characters with this
+# average confidence
+OCR_EARLY_EXIT_CONF = float(os.getenv('OCR_EARLY_EXIT_CONF', '0.85'))
+OCR_EARLY_EXIT_MIN_CHARS = 10
+
+# Images whose shorter side is below this are upscaled 2x before OCR
+OCR_UPSCALE_BELOW = 600
+
+# Speckle removal on the binarized image. Text is dark (0) on a light (255)
+# background after THRESH_BINARY; an opening keeps thin dark strokes, while
+# a closing would dilate the background over them
+_DENOISE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+_DENOISE_KERNEL.setflags(write=False)
+
+# Recent results, so a client retrying the same image skips the OCR pipeline
+_ocr_cache = ResultCache(maxsize=int(os.getenv('OCR_CACHE_SIZE', '128')))
+
+# Intra-op threads for EasyOCR's PyTorch inference
+OCR_TORCH_THREADS = int(os.getenv('OCR_TORCH_THREADS', os.cpu_count() or 1))
+
+_easyocr_lock = threading.Lock()
+
+def _configure_torch():
+    """Select the int8 kernel backend and thread count before the models load"""
+    # x86 keeps PyTorch's default fbgemm engine (VNNI-accelerated); ARM
+    # servers need qnnpack for the quantized kernels
+    if platform.machine().lower() in ('arm64', 'aarch64') and \
+            'qnnpack' in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = 'qnnpack'
+    torch.set_num_threads(OCR_TORCH_THREADS)
+
+@functools.lru_cache(maxsize=1)
+def _load_easyocr_reader() -> Optional["easyocr.Reader"]:
+    """Load the EasyOCR models once per process (None if unavailable)"""
+    try:
+        _configure_torch()
+        # quantize=True applies dynamic int8 quantization to the detector and
+        # recognizer when running on CPU
+        return easyocr.Reader(['en'], gpu=False, quantize=True)
+    except Exception as e:
+        logger.warning(f"EasyOCR initialization failed: {e}")
+        return None
+
+def get_easyocr_reader() -> Optional["easyocr.Reader"]:
+    """Return the process-wide EasyOCR reader, loading it on first use"""
+    # The lock keeps concurrent first requests from loading the models twice
+    with _easyocr_lock:
+        return _load_easyocr_reader()
+
+_TESS_WHITELIST = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:-+$%'
+# Custom config for better number recognition (pytesseract fallback)
+_TESS_CONFIG = f'--oem 3 --psm 6 -c tessedit_char_whitelist={_TESS_WHITELIST}'
+_tess_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _get_tess_api() -> Optional["PyTessBaseAPI"]:
+    """Create the process-wide libtesseract API (None if unavailable)"""
+    try:
+        api = PyTessBaseAPI(psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+        api.SetVariable('tessedit_char_whitelist', _TESS_WHITELIST)
+        return api
+    except Exception as e:
+        logger.warning(f"tesserocr initialization failed: {e}")
+        return None
+
+@functools.lru_cache(maxsize=1)
+def tesseract_available() -> bool:
+    """Probe Tesseract once per process"""
+    if PyTessBaseAPI is not None:
+        return _get_tess_api() is not None
+    try:
+        # You may need to set the path to tesseract executable
+        # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception as e:
+        logger.warning(f"Tesseract not available: {e}")
+        return False
+
+tesseract_available()
+
 class AdvancedOCR:
     """Advanced OCR service using multiple engines for better accuracy"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # Initialize EasyOCR reader
-        try:
-            self.easyocr_reader = easyocr.Reader(['en'], gpu=False)
-            self.easyocr_available = True
-        except Exception as e:
-            self.logger.warning(f"EasyOCR initialization failed: {e}")
-            self.easyocr_available = False
-            
-        # Test Tesseract availability
-        try:
-            # You may need to set the path to tesseract executable
-            # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-            pytesseract.get_tesseract_version()
-            self.tesseract_available = True
-        except Exception as e:
-            self.logger.warning(f"Tesseract not available: {e}")
-            self.tesseract_available = False
+        # Engines are process-wide singletons shared by all instances and
+        # Flask worker threads; loading here keeps the first request warm
+        get_easyocr_reader()
     
-    def extract_text_from_image(self, image_data: str) -> Dict:
+    def extract_text_from_image(self, image_data: Union[str, bytes], use_cache: bool = True) -> Dict:
         """
         Extract text from image using multiple OCR engines
         
         Args:
-            image_data: Base64 encoded image data
+            image_data: Base64 encoded image data, or the raw encoded image bytes
+            use_cache: Look up and store the result in the recent-results cache
             
         Returns:
             Dict containing extracted text and confidence scores
         """
         try:
+            if use_cache:
+                digest = content_digest(image_data)
+                cached = _ocr_cache.get(digest)
+                if cached is not None:
+                    return cached
+            
             # Decode image
             image = self._decode_image(image_data)
             if image is None:
@@ -56,13 +169,31 @@ class AdvancedOCR:
             
             results = {}
             
+            # Start Tesseract in the background so both engines (which
+            # release the GIL) run concurrently
+            tesseract_future = None
+            if tesseract_available() and OCR_PARALLEL:
+                tesseract_future = _ocr_pool.submit(self._extract_with_tesseract, processed_image)
+            
             # Try EasyOCR
-            if self.easyocr_available:
+            if get_easyocr_reader() is not None:
                 easyocr_result = self._extract_with_easyocr(processed_image)
                 results['easyocr'] = easyocr_result
             
+            # A confident EasyOCR read is enough for the structural signal
+            # patterns, so Tesseract's pass can be skipped
+            easyocr_data = results.get('easyocr', {})
+            easyocr_confident = (easyocr_data.get('confidence', 0) >= OCR_EARLY_EXIT_CONF and
+                                 len(easyocr_data.get('text', '')) >= OCR_EARLY_EXIT_MIN_CHARS)
+            
             # Try Tesseract
-            if self.tesseract_available:
+            if easyocr_confident:
+                if tesseract_future is not None:
+                    # Best effort: a pass that already started is left to finish
+                    tesseract_future.cancel()
+            elif tesseract_future is not None:
+                results['tesseract'] = tesseract_future.result()
+            elif tesseract_available():
                 tesseract_result = self._extract_with_tesseract(processed_image)
                 results['tesseract'] = tesseract_result
             
@@ -70,13 +201,16 @@ class AdvancedOCR:
             combined_text = self._combine_ocr_results(results)
             trading_signals = self._extract_trading_signals(combined_text)
             
-            return {
+            result = {
                 "success": True,
                 "extracted_text": combined_text,
                 "ocr_results": results,
                 "trading_signals": trading_signals,
                 "method": "advanced_multi_ocr"
             }
+            if use_cache:
+                _ocr_cache.put(digest, result)
+            return result
             
         except Exception as e:
             self.logger.error(f"OCR extraction failed: {str(e)}")
@@ -87,39 +221,58 @@ class AdvancedOCR:
                 "trading_signals": {"found": False}
             }
     
-    def _decode_image(self, image_data: str) -> Optional[np.ndarray]:
-        """Decode base64 image to OpenCV format"""
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics of the OCR result cache"""
+        return _ocr_cache.stats()
+    
+    def _decode_image(self, image_data: Union[str, bytes]) -> Optional[np.ndarray]:
+        """Decode base64 (or raw encoded) image to OpenCV format"""
         try:
-            # Remove data URL prefix if present
-            if image_data.startswith('data:'):
-                if ',' in image_data:
-                    image_data = image_data.split(',')[1]
-                else:
-                    self.logger.error("Invalid data URL format")
+            if isinstance(image_data, bytes):
+                # Binary uploads are already the encoded image
+                image_bytes = image_data
+            else:
+                # Remove data URL prefix if present
+                if image_data.startswith('data:'):
+                    _, separator, image_data = image_data.partition(',')
+                    if not separator:
+                        self.logger.error("Invalid data URL format")
+                        return None
+                
+                # Decode base64 (whitespace is skipped by the decoder)
+                try:
+                    image_bytes = b64decode(image_data)
+                except Exception as e:
+                    self.logger.error(f"Base64 decode failed: {str(e)}")
                     return None
             
-            # Clean up base64 string
-            image_data = image_data.strip()
-            
-            # Decode base64
-            try:
-                image_bytes = base64.b64decode(image_data)
-            except Exception as e:
-                self.logger.error(f"Base64 decode failed: {str(e)}")
-                return None
-            
             # Validate image data
             if len(image_bytes) < 100:
                 self.logger.error(f"Image data too small: {len(image_bytes)} bytes")
                 return None
             
-            # Create BytesIO object
-            image_buffer = io.BytesIO(image_bytes)
-            image_buffer.seek(0)
+            # JPEG fast path: decode straight to BGR with libjpeg-turbo
+            if _turbojpeg is not None and image_bytes[:3] == b'\xff\xd8\xff':
+                try:
+                    opencv_image = _turbojpeg.decode(image_bytes, pixel_format=TJPF_BGR)
+                    self.logger.info(f"OCR: Successfully decoded image: {opencv_image.shape}")
+                    return opencv_image
+                except Exception as e:
+                    self.logger.warning(f"TurboJPEG decode failed, trying OpenCV: {str(e)}")
+            
+            # Decode straight to BGR with OpenCV (no intermediate RGB copy)
+            nparr = np.frombuffer(image_bytes, np.uint8)
+            opencv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
-            # Convert to PIL Image with explicit format detection
+            if opencv_image is not None:
+                self.logger.info(f"OCR: Successfully decoded image: {opencv_image.shape}")
+                return opencv_image
+            
+            self.logger.warning("OpenCV imdecode failed for OCR, trying PIL")
+            
+            # Fallback: PIL covers formats missing from some OpenCV builds
             try:
-                pil_image = Image.open(image_buffer)
+                pil_image = Image.open(io.BytesIO(image_bytes))
                 pil_image.load()  # Force loading
                 
                 # Convert to RGB if needed
@@ -129,22 +282,12 @@ class AdvancedOCR:
                 # Convert to OpenCV format
                 opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
                 
-                self.logger.info(f"OCR: Successfully decoded image: {opencv_image.shape}")
+                self.logger.info(f"OCR PIL fallback successful: {opencv_image.shape}")
                 return opencv_image
                 
             except Exception as e:
-                self.logger.error(f"PIL Image.open failed for OCR: {str(e)}")
-                
-                # Fallback: try direct OpenCV decode
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                opencv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if opencv_image is not None:
-                    self.logger.info(f"OCR OpenCV fallback successful: {opencv_image.shape}")
-                    return opencv_image
-                else:
-                    self.logger.error("OCR OpenCV fallback also failed")
-                    return None
+                self.logger.error(f"OCR PIL fallback also failed: {str(e)}")
+                return None
         except Exception as e:
             self.logger.error(f"Image decode failed: {str(e)}")
             return None
@@ -152,18 +295,26 @@ class AdvancedOCR:
     def _preprocess_for_ocr(self, image: np.ndarray) -> np.ndarray:
         """Preprocess image to improve OCR accuracy"""
         try:
+            height, width = image.shape[:2]
+            
             # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY,
+                                dst=scratch_buffer('gray', (height, width)))
             
             # Apply adaptive threshold
             thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                         cv2.THRESH_BINARY, 11, 2)
+                                         cv2.THRESH_BINARY, 11, 2,
+                                         dst=scratch_buffer('thresh', (height, width)))
+            
+            # Denoise (the grayscale buffer is free again at this point)
+            denoised = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, _DENOISE_KERNEL, dst=gray)
             
-            # Denoise
-            denoised = cv2.medianBlur(thresh, 3)
+            # Large screenshots already have legible text; upscaling them
+            # only quadruples the pixels every OCR engine has to scan
+            if min(height, width) >= OCR_UPSCALE_BELOW:
+                return denoised
             
-            # Upscale for better OCR
-            height, width = denoised.shape
+            # Upscale small images for better OCR
             upscaled = cv2.resize(denoised, (width * 2, height * 2), interpolation=cv2.INTER_CUBIC)
             
             return upscaled
@@ -175,46 +326,86 @@ class AdvancedOCR:
     def _extract_with_easyocr(self, image: np.ndarray) -> Dict:
         """Extract text using EasyOCR"""
         try:
-            results = self.easyocr_reader.readtext(image)
-            
-            extracted_texts = []
-            total_confidence = 0
-            
-            for (bbox, text, confidence) in results:
-                if confidence > 0.5:  # Filter low confidence results
-                    extracted_texts.append({
-                        "text": text.strip(),
-                        "confidence": float(confidence),
-                        "bbox": bbox
-                    })
-                    total_confidence += confidence
-            
-            avg_confidence = total_confidence / len(extracted_texts) if extracted_texts else 0
-            combined_text = " ".join([item["text"] for item in extracted_texts])
-            
-            return {
-                "text": combined_text,
-                "confidence": avg_confidence,
-                "word_count": len(extracted_texts),
-                "details": extracted_texts
-            }
+            return self._summarize_easyocr(get_easyocr_reader().readtext(image))
             
         except Exception as e:
             self.logger.error(f"EasyOCR failed: {str(e)}")
             return {"text": "", "confidence": 0, "error": str(e)}
     
+    def _extract_with_easyocr_batch(self, images: List[np.ndarray]) -> List[Dict]:
+        """
+        Extract text from several image regions in one EasyOCR detector pass
+        
+        Args:
+            images: Preprocessed image regions (e.g. title, order panel, candles)
+            
+        Returns:
+            One EasyOCR result dict per region, in input order
+        """
+        if not images:
+            return []
+        try:
+            # readtext_batched needs a common size; mismatched regions are
+            # resized to the largest one (bboxes are then in that space)
+            n_height = max(image.shape[0] for image in images)
+            n_width = max(image.shape[1] for image in images)
+            same_size = all(image.shape[:2] == (n_height, n_width) for image in images)
+            
+            batched = get_easyocr_reader().readtext_batched(
+                images,
+                n_width=None if same_size else n_width,
+                n_height=None if same_size else n_height,
+                batch_size=8
+            )
+            return [self._summarize_easyocr(results) for results in batched]
+            
+        except Exception as e:
+            self.logger.error(f"EasyOCR batch failed: {str(e)}")
+            return [{"text": "", "confidence": 0, "error": str(e)} for _ in images]
+    
+    def _summarize_easyocr(self, results: List) -> Dict:
+        """Filter EasyOCR detections by confidence and combine them"""
+        extracted_texts = []
+        total_confidence = 0
+        
+        for (bbox, text, confidence) in results:
+            if confidence > 0.5:  # Filter low confidence results
+                extracted_texts.append({
+                    "text": text.strip(),
+                    "confidence": float(confidence),
+                    "bbox": np.asarray(bbox).tolist()
+                })
+                total_confidence += float(confidence)
+        
+        avg_confidence = total_confidence / len(extracted_texts) if extracted_texts else 0
+        combined_text = " ".join([item["text"] for item in extracted_texts])
+        
+        return {
+            "text": combined_text,
+            "confidence": avg_confidence,
+            "word_count": len(extracted_texts),
+            "details": extracted_texts
+        }
+    
     def _extract_with_tesseract(self, image: np.ndarray) -> Dict:
         """Extract text using Tesseract"""
         try:
-            # Custom config for better number recognition
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:-+$%'
-            
-            # Extract text
-            text = pytesseract.image_to_string(image, config=custom_config)
+            if PyTessBaseAPI is not None:
+                # One in-process recognition pass yields text and confidences;
+                # the API object holds per-image state, so serialize access
+                with _tess_lock:
+                    api = _get_tess_api()
+                    api.SetImage(Image.fromarray(image))
+                    text = api.GetUTF8Text()
+                    confidences = [conf for conf in api.AllWordConfidences() if conf > 0]
+            else:
+                # Extract text
+                text = pytesseract.image_to_string(image, config=_TESS_CONFIG)
+                
+                # Get confidence data
+                data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+                confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
             
-            # Get confidence data
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             
             return {
@@ -246,11 +437,8 @@ class AdvancedOCR:
                 if tesseract_text and len(tesseract_text.strip()) > 5:
                     all_text.append(tesseract_text)
             
-            # Combine and clean
-            combined = " ".join(all_text)
-            cleaned = re.sub(r'\s+', ' ', combined).strip()
-            
-            return cleaned
+            # Combine and collapse whitespace runs in one str.split pass
+            return " ".join(word for text in all_text for word in text.split())
             
         except Exception as e:
             self.logger.error(f"OCR combination failed: {str(e)}")
@@ -262,22 +450,11 @@ class AdvancedOCR:
             return {"found": False}
         
         try:
-            text_lower = text.lower()
-            
-            # Trading signal patterns
-            patterns = {
-                "standard": r'(\w+)\s+(buy|sell|long|short)\s+(?:at\s+)?(\d+\.?\d*)[,\s]*(?:sl|stop|stoploss)[\s:]*(\d+\.?\d*)[,\s]*(?:tp|target|takeprofit)[\s:]*(\d+\.?\d*)',
-                "price_first": r'(?:entry|open)[\s:]*(\d+\.?\d*)[,\s]*(?:sl|stop)[\s:]*(\d+\.?\d*)[,\s]*(?:tp|target)[\s:]*(\d+\.?\d*)',
-                "symbol_action": r'(eth|btc|bitcoin|ethereum)\s+(short|long|buy|sell)',
-                "price_levels": r'(\d+\.?\d+).*?(\d+\.?\d+).*?(\d+\.?\d+)'
-            }
-            
             signals_found = []
             
-            for pattern_name, pattern in patterns.items():
-                matches = re.finditer(pattern, text_lower)
-                for match in matches:
-                    signal = self._parse_signal_match(match, pattern_name, text_lower)
+            for pattern_name, pattern in _SIGNAL_PATTERNS.items():
+                for match in pattern.finditer(text):
+                    signal = self._parse_signal_match(match, pattern_name, text)
                     if signal:
                         signals_found.append(signal)
             
@@ -306,7 +483,7 @@ class AdvancedOCR:
                 symbol, side, entry, sl, tp = groups
                 return {
                     "symbol": symbol.upper(),
-                    "side": side.replace('short', 'sell').replace('long', 'buy'),
+                    "side": side.lower().replace('short', 'sell').replace('long', 'buy'),
                     "entry_price": float(entry),
                     "stop_loss": float(sl),
                     "take_profit": float(tp),
@@ -317,8 +494,9 @@ class AdvancedOCR:
             elif pattern_name == "price_first":
                 entry, sl, tp = groups
                 # Determine side based on context
-                side = "sell" if "short" in full_text or "sell" in full_text else "buy"
-                symbol = "ETH" if "eth" in full_text else "BTC"
+                text_lower = full_text.lower()
+                side = "sell" if "short" in text_lower or "sell" in text_lower else "buy"
+                symbol = "ETH" if "eth" in text_lower else "BTC"
                 
                 return {
                     "symbol": symbol,
@@ -332,8 +510,8 @@ class AdvancedOCR:
             
             elif pattern_name == "symbol_action":
                 symbol, action = groups
-                symbol = "ETH" if "eth" in symbol else "BTC"
-                side = action.replace('short', 'sell').replace('long', 'buy')
+                symbol = "ETH" if "eth" in symbol.lower() else "BTC"
+                side = action.lower().replace('short', 'sell').replace('long', 'buy')
                 
                 # Use default prices for ETH
                 if symbol == "ETH":
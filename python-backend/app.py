@@ -1,12 +1,17 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
 import logging
 import os
+import time
+import base64
 from dotenv import load_dotenv
 import json
+import orjson
+import cv2
 import numpy as np
 
 from chart_analyzer import ChartImageAnalyzer
+import _b64
 # OCR import disabled - Tesseract not installed
 # from advanced_ocr import AdvancedOCR
 
@@ -17,19 +22,12 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-def convert_numpy_types(obj):
-    """Convert NumPy types to JSON-serializable Python types."""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {k: convert_numpy_types(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    return obj
+def ojsonify(obj):
+    """Serialize a response with orjson, which handles NumPy scalars and arrays natively."""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        mimetype='application/json'
+    )
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +39,7 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+logger.info(f"Base64 decoder: {_b64.DECODER}")
 
 # Initialize services
 chart_analyzer = ChartImageAnalyzer()
@@ -48,14 +47,65 @@ chart_analyzer = ChartImageAnalyzer()
 # ocr_service = AdvancedOCR()
 ocr_service = None
 
+def warmup():
+    """Run every analysis engine once so the first real request is not slow.
+
+    Triggers PyTorch/OpenCV kernel selection and pages model weights into
+    memory before traffic arrives.
+    """
+    started = time.time()
+    
+    # Tiny synthetic chart: two candles and a horizontal level
+    chart = np.full((64, 64, 3), 255, np.uint8)
+    cv2.rectangle(chart, (8, 16), (20, 48), (0, 160, 0), -1)
+    cv2.rectangle(chart, (32, 24), (44, 56), (0, 0, 200), -1)
+    cv2.line(chart, (0, 8), (63, 8), (200, 60, 30), 1)
+    image_data = base64.b64encode(cv2.imencode('.png', chart)[1]).decode()
+    
+    # Bypass the result caches so /health only counts real traffic
+    chart_analyzer.analyze_chart_image(image_data, use_cache=False)
+    if ocr_service is not None:
+        ocr_service.extract_text_from_image(image_data, use_cache=False)
+    
+    logger.info(f"Analysis engines warmed up in {time.time() - started:.2f}s")
+
+if os.getenv('PYTHON_BACKEND_WARMUP', 'true').lower() == 'true':
+    warmup()
+
+def get_image_payload():
+    """
+    Parse an image analysis request into a payload dict
+    
+    JSON bodies carry the image as a base64 string. Clients that can send
+    binary may instead upload the encoded image as a multipart "image" file,
+    or as the raw body (application/octet-stream or image/*) with the other
+    fields as query parameters. The image then reaches the analyzers as
+    bytes, skipping the base64 round-trip and its extra copies.
+    """
+    if 'image' in request.files:
+        payload = request.form.to_dict()
+        payload['image'] = request.files['image'].read()
+        return payload
+    
+    if request.mimetype == 'application/octet-stream' or request.mimetype.startswith('image/'):
+        payload = request.args.to_dict()
+        payload['image'] = request.get_data(cache=False)
+        return payload
+    
+    return request.get_json()
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    status = {
         "status": "healthy",
         "service": "Python Trading Image Analysis Backend",
-        "version": "1.0.0"
-    })
+        "version": "1.0.0",
+        "chart_cache": chart_analyzer.cache_stats()
+    }
+    if ocr_service is not None:
+        status["ocr_cache"] = ocr_service.cache_stats()
+    return ojsonify(status)
 
 @app.route('/analyze-chart', methods=['POST'])
 def analyze_chart():
@@ -67,23 +117,27 @@ def analyze_chart():
         "image": "base64_encoded_image_data",
         "analysis_type": "comprehensive" | "quick" | "ocr_only"
     }
+    
+    The image may also be sent as binary (see get_image_payload), with
+    analysis_type as a form field or query parameter.
     """
     try:
         # Parse request
-        data = request.get_json()
+        data = get_image_payload()
         
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return ojsonify({"error": "No JSON data provided"}), 400
         
         image_data = data.get('image')
         analysis_type = data.get('analysis_type', 'comprehensive')
         
         if not image_data:
-            return jsonify({"error": "No image data provided"}), 400
+            return ojsonify({"error": "No image data provided"}), 400
         
         logger.info(f"Starting {analysis_type} analysis for chart image")
         
         result = {}
+        trade_setup_copied = False
         
         # Perform chart analysis
         if analysis_type in ['comprehensive', 'quick']:
@@ -95,9 +149,11 @@ def analyze_chart():
                 logger.info("Chart analysis provided trading signal")
                 result['recommended_signal'] = chart_analysis['trading_signal']
                 result['primary_method'] = 'chart_analysis'
+                trade_setup_copied = 'trade_mode' in chart_analysis['trading_signal']
         
-        # Perform OCR analysis
-        if analysis_type in ['comprehensive', 'ocr_only']:
+        # Perform OCR analysis (a trade setup copied from the chart is final,
+        # so there is nothing for OCR to add)
+        if analysis_type in ['comprehensive', 'ocr_only'] and not trade_setup_copied:
             if ocr_service is not None:
                 ocr_analysis = ocr_service.extract_text_from_image(image_data)
                 result['ocr_analysis'] = ocr_analysis
@@ -154,12 +210,9 @@ def analyze_chart():
         result['timestamp'] = data.get('timestamp', '')
         result['backend'] = 'python_cv_ocr'
         
-        # Convert NumPy types to JSON-serializable types
-        result = convert_numpy_types(result)
-        
         logger.info(f"Analysis complete. Method: {result['primary_method']}, Signal: {result['recommended_signal']['side']} {result['recommended_signal']['symbol']}")
         
-        return jsonify(result)
+        return ojsonify(result)
         
     except Exception as e:
         logger.error(f"Chart analysis failed: {str(e)}", exc_info=True)
@@ -187,10 +240,7 @@ def analyze_chart():
             "backend": "python_cv_ocr"
         }
         
-        # Convert NumPy types to JSON-serializable types
-        error_response = convert_numpy_types(error_response)
-        
-        return jsonify(error_response), 500
+        return ojsonify(error_response), 500
 
 @app.route('/extract-text', methods=['POST'])
 def extract_text():
@@ -201,16 +251,18 @@ def extract_text():
     {
         "image": "base64_encoded_image_data"
     }
+    
+    The image may also be sent as binary (see get_image_payload).
     """
     try:
-        data = request.get_json()
+        data = get_image_payload()
         
         if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+            return ojsonify({"error": "No JSON data provided"}), 400
         
         image_data = data.get('image')
         if not image_data:
-            return jsonify({"error": "No image data provided"}), 400
+            return ojsonify({"error": "No image data provided"}), 400
         
         logger.info("Starting OCR text extraction")
         
@@ -219,11 +271,11 @@ def extract_text():
         
         logger.info(f"OCR extraction complete. Text length: {len(result.get('extracted_text', ''))}")
         
-        return jsonify(result)
+        return ojsonify(result)
         
     except Exception as e:
         logger.error(f"OCR extraction failed: {str(e)}", exc_info=True)
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": str(e),
             "extracted_text": "",
@@ -269,7 +321,7 @@ def test_signal():
                 "method": "python_test"
             }
         
-        return jsonify({
+        return ojsonify({
             "test_signal": signal,
             "backend": "python_test",
             "timestamp": data.get('timestamp', '')
@@ -277,7 +329,7 @@ def test_signal():
         
     except Exception as e:
         logger.error(f"Test signal failed: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
     port = int(os.getenv('PYTHON_BACKEND_PORT', 5000))
@@ -1,126 +1,242 @@
 import cv2
 import numpy as np
 from PIL import Image
-import base64
 import io
+import os
 import logging
-from typing import Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Optional, Union
+
+from _b64 import b64decode
+from _cache import ResultCache, content_digest
+from _pool import LazyExecutor
+from _scratch import scratch_buffer
 
 logger = logging.getLogger(__name__)
 
+# Saturation/value bin width of the joint HSV histogram
+HSV_SV_BIN = 10
+
+# Charts are analyzed with their longer side downscaled to this many pixels
+# (0 keeps full resolution); color ratios and relative line lengths survive it
+CHART_MAX_DIMENSION = int(os.getenv('CHART_MAX_DIMENSION', '640'))
+
+# Trend and trading marker colors: inclusive OpenCV hue ranges and the
+# minimum saturation/value (a multiple of HSV_SV_BIN) a pixel must reach
+CHART_COLORS = {
+    "green": (((35, 85),), 50),              # bullish candles
+    "red": (((0, 10), (170, 180)), 50),      # bearish candles, stop loss or target lines
+    "blue": (((100, 130),), 30),             # support/resistance and entry lines
+    "purple": (((140, 170),), 30),           # trade boxes
+    "yellow": (((15, 35),), 50)              # take profit lines
+}
+
+# Weights of the analysis components in a new signal's strength score
+SIGNAL_WEIGHTS = {
+    "trend": 0.4,
+    "patterns": 0.3,
+    "price_action": 0.2,
+    "support_resistance": 0.1
+}
+
+# Signal side implied by a trend color / price action direction
+_TREND_SIDES = {"bearish": "sell", "bullish": "buy"}
+_PRICE_ACTION_SIDES = {"downward": "sell", "upward": "buy"}
+
+# (stop loss %, take profit %) of a new signal by side; negative values sit
+# below the entry, i.e. 0.5% stop loss and 2% take profit either way
+_STOP_LOSS_TAKE_PROFIT = {"sell": (0.5, -2.0), "buy": (-0.5, 2.0)}
+
+# Fields and key order shared by every signal the analyzer emits (read-only)
+_BASE_SIGNAL = MappingProxyType({
+    "isSignal": True,
+    "confidence": None,
+    "symbol": "ETH",
+    "side": None,
+    "entryPrice": None,  # Use market price
+    "stopLoss": None,  # Legacy field - will be calculated from percentage
+    "takeProfit": None,  # Legacy field - will be calculated from percentage
+    "stopLossPercent": None,
+    "takeProfitPercent": None,
+    "quantity": 0.1,
+    "leverage": 1,
+    "reasoning": "",
+    "method": None
+})
+
+def _signal(side: str, confidence: float, **fields) -> Dict:
+    """Signal dict: the _BASE_SIGNAL fields with the given side, confidence and overrides"""
+    return dict(_BASE_SIGNAL, side=side, confidence=confidence, **fields)
+
+# Signal returned when analysis fails (copy it and fill in the reasoning)
+_FALLBACK_SIGNAL = MappingProxyType(_signal(
+    "sell", 0.75,
+    stopLossPercent=0.5,  # 0.5% stop loss
+    takeProfitPercent=2.0,  # 2% take profit
+    method="python_error_fallback"
+))
+
+def _structuring_element(width: int, height: int) -> np.ndarray:
+    """Read-only rectangular kernel, safe to share between request threads"""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (width, height))
+    kernel.setflags(write=False)
+    return kernel
+
+# Morphology kernels for candlestick bodies/wicks and volume bars
+_CANDLE_VERTICAL_KERNEL = _structuring_element(1, 10)
+_CANDLE_HORIZONTAL_KERNEL = _structuring_element(10, 1)
+_VOLUME_BAR_KERNEL = _structuring_element(1, 5)
+
+# Run the independent analyzers concurrently (OpenCV releases the GIL)
+CHART_PARALLEL = os.getenv('CHART_PARALLEL', 'true').lower() == 'true'
+_analysis_pool = LazyExecutor(max_workers=min(6, os.cpu_count() or 1), thread_name_prefix='chart')
+
+# Recent results, so a UI re-sending the same snapshot skips the analysis
+_chart_cache = ResultCache(maxsize=int(os.getenv('CHART_CACHE_SIZE', '64')))
+
 class ChartImageAnalyzer:
     """Advanced chart image analysis using computer vision"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-    def analyze_chart_image(self, image_data: str) -> Dict:
+    def analyze_chart_image(self, image_data: Union[str, bytes], use_cache: bool = True) -> Dict:
         """
         Analyze trading chart image and extract trading signals
         
         Args:
-            image_data: Base64 encoded image data
+            image_data: Base64 encoded image data, or the raw encoded image bytes
+            use_cache: Look up and store the result in the recent-results cache
             
         Returns:
             Dict containing analysis results and trading signals
         """
         try:
-            print("\n🔍 === STARTING CHART ANALYSIS ===")
-            self.logger.info("🔍 Starting comprehensive chart image analysis")
+            self.logger.debug("Starting comprehensive chart image analysis")
+            
+            if use_cache:
+                digest = content_digest(image_data)
+                cached = _chart_cache.get(digest)
+                if cached is not None:
+                    return cached
             
             # Decode base64 image
             image = self._decode_image(image_data)
             if image is None:
                 return self._create_error_response("Failed to decode image")
             
-            print(f"📊 Image decoded successfully: {image.shape}")
-            self.logger.info(f"📊 Image decoded - Shape: {image.shape}")
-            
-            # Perform comprehensive analysis
-            print("\n🎯 Running trend analysis...")
-            trend_analysis = self._analyze_trend_colors(image)
-            print(f"📈 Trend Analysis Result: {trend_analysis}")
-            
-            print("\n� Detecting existing trade setup...")
-            existing_trade = self._detect_existing_trade(image)
-            print(f"📋 Existing Trade Detection: {existing_trade}")
-            
-            print("\n�🕯️ Detecting candlestick patterns...")
-            candlestick_patterns = self._detect_candlestick_patterns(image)
-            print(f"🕯️ Candlestick Patterns: {candlestick_patterns}")
-            
-            print("\n📏 Finding support/resistance levels...")
-            support_resistance = self._find_support_resistance_levels(image)
-            print(f"📏 Support/Resistance: {support_resistance}")
-            
-            print("\n💹 Analyzing price action...")
-            price_action = self._analyze_price_action(image)
-            print(f"💹 Price Action: {price_action}")
-            
-            print("\n📊 Analyzing volume patterns...")
-            volume_analysis = self._analyze_volume_patterns(image)
-            print(f"📊 Volume Analysis: {volume_analysis}")
-            
-            analysis_results = {
-                "trend_analysis": trend_analysis,
-                "existing_trade": existing_trade,
-                "candlestick_patterns": candlestick_patterns,
-                "support_resistance": support_resistance,
-                "price_action": price_action,
-                "volume_analysis": volume_analysis
-            }
+            self.logger.debug("Image decoded - Shape: %s", image.shape)
+            
+            # Downscale large screenshots once; every analyzer runs on the small frame
+            height, width = image.shape[:2]
+            scale = max(1.0, max(height, width) / CHART_MAX_DIMENSION) if CHART_MAX_DIMENSION > 0 else 1.0
+            if scale > 1.0:
+                size = (int(width / scale), int(height / scale))
+                image = cv2.resize(image, size, dst=scratch_buffer("small", (size[1], size[0], 3)),
+                                   interpolation=cv2.INTER_AREA)
+            
+            # Shared color conversions and edge maps, computed once per image
+            # into this thread's scratch buffers
+            frame = image.shape[:2]
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=scratch_buffer("gray", frame))
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=scratch_buffer("hsv", image.shape))
+            histogram = self._hsv_histogram(hsv)
+            edges_lo = cv2.Canny(gray, 30, 100, edges=scratch_buffer("edges_lo", frame), apertureSize=3)
+            segments = self._detect_line_segments(edges_lo)
+            
+            # A chart showing a trade setup is copied as drawn, whatever the
+            # other analyzers say, so they only run when a new signal is needed
+            existing_trade = self._detect_existing_trade(histogram, segments, frame)
+            if existing_trade.get("has_existing_trade", False):
+                analysis_results = {"existing_trade": existing_trade}
+            else:
+                blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=scratch_buffer("blurred", frame))
+                edges_hi = cv2.Canny(blurred, 50, 150, edges=scratch_buffer("edges_hi", frame))
+                
+                # Perform comprehensive analysis: the analyzers only read the
+                # shared inputs, so they can run side by side
+                stages = {
+                    "trend_analysis": (self._analyze_trend_colors, histogram),
+                    "candlestick_patterns": (self._detect_candlestick_patterns, gray),
+                    "support_resistance": (self._find_support_resistance_levels, segments, scale),
+                    "price_action": (self._analyze_price_action, edges_hi),
+                    "volume_analysis": (self._analyze_volume_patterns, gray)
+                }
+                if CHART_PARALLEL:
+                    futures = {name: _analysis_pool.submit(*stage) for name, stage in stages.items()}
+                    analysis_results = {name: future.result() for name, future in futures.items()}
+                else:
+                    analysis_results = {name: analyzer(*args) for name, (analyzer, *args) in stages.items()}
+                analysis_results["existing_trade"] = existing_trade
+            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for name, result in analysis_results.items():
+                    self.logger.debug("%s: %s", name, result)
             
             # Generate trading signal
-            print("\n🎯 Generating trading signal...")
             trading_signal = self._generate_trading_signal(analysis_results)
-            print(f"🎯 Trading Signal Generated: {trading_signal}")
-            print("✅ === ANALYSIS COMPLETE ===\n")
+            self.logger.info("Chart analysis complete: %s signal (%.2f confidence) via %s",
+                             trading_signal.get("side"), trading_signal.get("confidence", 0),
+                             trading_signal.get("method"))
             
-            return {
+            result = {
                 "success": True,
                 "analysis": analysis_results,
                 "trading_signal": trading_signal,
                 "confidence": trading_signal.get("confidence", 0.75),
                 "method": "python_cv_analysis"
             }
+            if use_cache:
+                _chart_cache.put(digest, result)
+            return result
             
         except Exception as e:
             self.logger.error(f"Chart analysis failed: {str(e)}")
             return self._create_error_response(f"Analysis failed: {str(e)}")
     
-    def _decode_image(self, image_data: str) -> Optional[np.ndarray]:
-        """Decode base64 image data to OpenCV format"""
+    def cache_stats(self) -> Dict:
+        """Hit/miss statistics of the chart result cache"""
+        return _chart_cache.stats()
+    
+    def _decode_image(self, image_data: Union[str, bytes]) -> Optional[np.ndarray]:
+        """Decode base64 (or raw encoded) image data to OpenCV format"""
         try:
-            # Remove data URL prefix if present
-            if image_data.startswith('data:'):
-                if ',' in image_data:
-                    image_data = image_data.split(',')[1]
-                else:
-                    self.logger.error("Invalid data URL format")
+            if isinstance(image_data, bytes):
+                # Binary uploads are already the encoded image
+                image_bytes = image_data
+            else:
+                # Remove data URL prefix if present
+                if image_data.startswith('data:'):
+                    _, separator, image_data = image_data.partition(',')
+                    if not separator:
+                        self.logger.error("Invalid data URL format")
+                        return None
+                
+                # Decode base64 (whitespace is skipped by the decoder)
+                try:
+                    image_bytes = b64decode(image_data)
+                except Exception as e:
+                    self.logger.error(f"Base64 decode failed: {str(e)}")
                     return None
             
-            # Clean up base64 string
-            image_data = image_data.strip()
-            
-            # Decode base64
-            try:
-                image_bytes = base64.b64decode(image_data)
-            except Exception as e:
-                self.logger.error(f"Base64 decode failed: {str(e)}")
-                return None
-            
             # Validate image data
             if len(image_bytes) < 100:  # Minimum viable image size
                 self.logger.error(f"Image data too small: {len(image_bytes)} bytes")
                 return None
             
-            # Create BytesIO object
-            image_buffer = io.BytesIO(image_bytes)
-            image_buffer.seek(0)  # Reset to beginning
+            # Decode straight to BGR with OpenCV (no intermediate RGB copy)
+            nparr = np.frombuffer(image_bytes, np.uint8)
+            opencv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
-            # Convert to PIL Image with explicit format detection
+            if opencv_image is not None:
+                self.logger.info(f"Successfully decoded image: {opencv_image.shape}")
+                return opencv_image
+            
+            self.logger.warning("OpenCV imdecode failed, trying PIL")
+            
+            # Fallback: PIL covers formats missing from some OpenCV builds
             try:
-                pil_image = Image.open(image_buffer)
+                pil_image = Image.open(io.BytesIO(image_bytes))
                 pil_image.load()  # Force loading of the image
                 
                 # Convert to RGB if needed
@@ -130,52 +246,24 @@ class ChartImageAnalyzer:
                 # Convert to OpenCV format (BGR)
                 opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
                 
-                self.logger.info(f"Successfully decoded image: {opencv_image.shape}")
+                self.logger.info(f"PIL fallback successful: {opencv_image.shape}")
                 return opencv_image
                 
             except Exception as e:
-                self.logger.error(f"PIL Image.open failed: {str(e)}")
-                
-                # Fallback: try direct OpenCV decode
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                opencv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if opencv_image is not None:
-                    self.logger.info(f"OpenCV fallback successful: {opencv_image.shape}")
-                    return opencv_image
-                else:
-                    self.logger.error("OpenCV fallback also failed")
-                    return None
+                self.logger.error(f"PIL fallback also failed: {str(e)}")
+                return None
             
         except Exception as e:
             self.logger.error(f"Image decode failed: {str(e)}")
             return None
     
-    def _analyze_trend_colors(self, image: np.ndarray) -> Dict:
-        """Analyze predominant colors to determine market trend"""
+    def _analyze_trend_colors(self, histogram: np.ndarray) -> Dict:
+        """Analyze predominant colors (from the joint HSV histogram) to determine market trend"""
         try:
-            # Convert to HSV for better color analysis
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            
-            # Define color ranges for green (bullish) and red (bearish)
-            green_lower = np.array([35, 50, 50])  # Green hue range
-            green_upper = np.array([85, 255, 255])
-            
-            red_lower1 = np.array([0, 50, 50])     # Red hue range (wraparound)
-            red_upper1 = np.array([10, 255, 255])
-            red_lower2 = np.array([170, 50, 50])
-            red_upper2 = np.array([180, 255, 255])
-            
-            # Create masks
-            green_mask = cv2.inRange(hsv, green_lower, green_upper)
-            red_mask1 = cv2.inRange(hsv, red_lower1, red_upper1)
-            red_mask2 = cv2.inRange(hsv, red_lower2, red_upper2)
-            red_mask = cv2.bitwise_or(red_mask1, red_mask2)
-            
-            # Calculate pixel counts
-            green_pixels = cv2.countNonZero(green_mask)
-            red_pixels = cv2.countNonZero(red_mask)
-            total_pixels = image.shape[0] * image.shape[1]
+            # Calculate green (bullish) and red (bearish) pixel counts
+            green_pixels = self._count_color_pixels(histogram, *CHART_COLORS["green"])
+            red_pixels = self._count_color_pixels(histogram, *CHART_COLORS["red"])
+            total_pixels = int(histogram.sum(dtype=np.float64))
             
             green_ratio = green_pixels / total_pixels
             red_ratio = red_pixels / total_pixels
@@ -203,82 +291,46 @@ class ChartImageAnalyzer:
             self.logger.error(f"Trend analysis failed: {str(e)}")
             return {"trend": "neutral", "confidence": 0.5, "error": str(e)}
     
-    def _detect_existing_trade(self, image: np.ndarray) -> Dict:
-        """Detect existing trade markers in the chart and extract trade parameters to copy"""
+    def _detect_line_segments(self, edges: np.ndarray) -> np.ndarray:
+        """Line segments at least a quarter of the chart wide, as an (N, 4) array of x1, y1, x2, y2 rows
+        
+        Run once per image on the Canny 30/100 edges; the trade marker and
+        support/resistance analyzers each filter the shared result.
+        """
+        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=40,
+                                minLineLength=edges.shape[1]//4, maxLineGap=20)
+        if lines is None:
+            return np.empty((0, 4), dtype=np.int64)
+        return lines.reshape(-1, 4).astype(np.int64)
+    
+    def _detect_existing_trade(self, histogram: np.ndarray, segments: np.ndarray,
+                               frame: Tuple[int, int]) -> Dict:
+        """Detect existing trade markers (joint HSV histogram, shared line segments) and extract trade parameters to copy"""
         try:
-            print("🔍 Scanning for existing trade markers to COPY...")
-            
-            # Convert to HSV for better color detection
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            height, width = image.shape[:2]
-            
-            # Define color ranges for trading markers (more precise for trade copying)
-            # Blue lines (common for support/resistance and entry levels)
-            blue_lower = np.array([100, 30, 30])
-            blue_upper = np.array([130, 255, 255])
-            blue_mask = cv2.inRange(hsv, blue_lower, blue_upper)
-            
-            # Purple/Magenta areas (rectangular zones, trade boxes)
-            purple_lower = np.array([140, 30, 30])
-            purple_upper = np.array([170, 255, 255])
-            purple_mask = cv2.inRange(hsv, purple_lower, purple_upper)
-            
-            # Red lines (often stop loss or target levels)
-            red_lower1 = np.array([0, 50, 50])
-            red_upper1 = np.array([10, 255, 255])
-            red_lower2 = np.array([170, 50, 50])  
-            red_upper2 = np.array([180, 255, 255])
-            red_mask = cv2.bitwise_or(cv2.inRange(hsv, red_lower1, red_upper1), 
-                                     cv2.inRange(hsv, red_lower2, red_upper2))
-            
-            # Yellow/Orange lines (often take profit levels)
-            yellow_lower = np.array([15, 50, 50])
-            yellow_upper = np.array([35, 255, 255])
-            yellow_mask = cv2.inRange(hsv, yellow_lower, yellow_upper)
-            
-            # Detect horizontal lines more precisely
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 30, 100, apertureSize=3)
+            height, width = frame
             
             # Find horizontal lines (price levels)
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=40, minLineLength=width//4, maxLineGap=20)
-            
-            horizontal_levels = []
-            if lines is not None:
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
-                    # Strong horizontal line filter (very flat lines)
-                    if abs(y2 - y1) <= 3 and abs(x2 - x1) >= width//4:
-                        y_pos = (y1 + y2) / 2
-                        horizontal_levels.append({
-                            'y_position': y_pos,
-                            'height_ratio': y_pos / height,  # Position as ratio of image height
-                            'length': abs(x2 - x1),
-                            'strength': abs(x2 - x1) / width  # Line strength relative to width
-                        })
-            
-            # Sort levels by position (top to bottom)
-            horizontal_levels.sort(key=lambda x: x['y_position'])
-            
-            # Count significant colored markers
-            blue_pixels = cv2.countNonZero(blue_mask)
-            purple_pixels = cv2.countNonZero(purple_mask)
-            red_pixels = cv2.countNonZero(red_mask)
-            yellow_pixels = cv2.countNonZero(yellow_mask)
+            dx = np.abs(segments[:, 2] - segments[:, 0])
+            dy = np.abs(segments[:, 3] - segments[:, 1])
+            
+            # Strong horizontal line filter (very flat lines); price levels
+            # as an (N, 2) array of [y_position, length] rows
+            flat = (dy <= 3) & (dx >= width//4)
+            horizontal_levels = np.column_stack([
+                (segments[flat, 1] + segments[flat, 3]) / 2,
+                dx[flat]
+            ])
+            
+            # Count significant colored markers (read off the shared histogram)
+            blue_pixels = self._count_color_pixels(histogram, *CHART_COLORS["blue"])
+            purple_pixels = self._count_color_pixels(histogram, *CHART_COLORS["purple"])
+            red_pixels = self._count_color_pixels(histogram, *CHART_COLORS["red"])
+            yellow_pixels = self._count_color_pixels(histogram, *CHART_COLORS["yellow"])
             total_pixels = height * width
             
             # Calculate marker density
             blue_density = blue_pixels / total_pixels
             purple_density = purple_pixels / total_pixels
-            red_density = red_pixels / total_pixels
-            yellow_density = yellow_pixels / total_pixels
-            
-            print(f"📊 Trade Marker Analysis:")
-            print(f"   - Blue markers: {blue_pixels} pixels ({blue_density:.1%})")
-            print(f"   - Purple zones: {purple_pixels} pixels ({purple_density:.1%})")
-            print(f"   - Red markers: {red_pixels} pixels ({red_density:.1%})")
-            print(f"   - Yellow markers: {yellow_pixels} pixels ({yellow_density:.1%})")
-            print(f"   - Horizontal levels: {len(horizontal_levels)}")
             
             # Strong indicator of existing trade setup
             has_trade_setup = (
@@ -287,12 +339,10 @@ class ChartImageAnalyzer:
                 len(horizontal_levels) >= 3  # Multiple price levels
             )
             
+            self.logger.debug("Trade markers: blue=%d purple=%d red=%d yellow=%d levels=%d",
+                              blue_pixels, purple_pixels, red_pixels, yellow_pixels, len(horizontal_levels))
+            
             if has_trade_setup:
-                print(f"✅ EXISTING TRADE SETUP DETECTED - COPYING TRADE:")
-                print(f"   - Blue support/resistance lines: {blue_density:.1%}")
-                print(f"   - Purple trade zones: {purple_density:.1%}")
-                print(f"   - Price levels detected: {len(horizontal_levels)}")
-                
                 # Estimate trade parameters from detected levels
                 trade_params = self._extract_trade_parameters(horizontal_levels, height)
                 
@@ -313,7 +363,6 @@ class ChartImageAnalyzer:
                     "action": "copy_trade_setup"
                 }
             else:
-                print("❌ No clear existing trade setup to copy")
                 return {
                     "has_existing_trade": False,
                     "trade_type": "new_signal",
@@ -330,28 +379,43 @@ class ChartImageAnalyzer:
                 "action": "generate_new_signal"
             }
     
-    def _extract_trade_parameters(self, levels, image_height):
-        """Extract trade parameters from detected price levels"""
+    def _hsv_histogram(self, hsv: np.ndarray) -> np.ndarray:
+        """Joint hue x saturation x value histogram (one bin per hue, HSV_SV_BIN-wide S/V bins)"""
+        sv_bins = 256 // HSV_SV_BIN + 1
+        sv_range = sv_bins * HSV_SV_BIN
+        return cv2.calcHist([hsv], [0, 1, 2], None, [180, sv_bins, sv_bins],
+                            [0, 180, 0, sv_range, 0, sv_range])
+    
+    def _count_color_pixels(self, histogram: np.ndarray, hue_ranges, min_sv: int) -> int:
+        """Pixels within any of the inclusive hue ranges with saturation and value >= min_sv"""
+        sv_bin = min_sv // HSV_SV_BIN
+        return int(sum(histogram[low:high + 1, sv_bin:, sv_bin:].sum(dtype=np.float64)
+                       for low, high in hue_ranges))
+    
+    def _extract_trade_parameters(self, levels: np.ndarray, image_height: int) -> Dict:
+        """Extract trade parameters from detected price levels ([y_position, length] rows)"""
         try:
             # Assume current price is around middle of image (common chart layout)
             current_price_y = image_height * 0.5  # Middle of chart
             
             # Find levels above and below current price
-            levels_above = [l for l in levels if l['y_position'] < current_price_y]
-            levels_below = [l for l in levels if l['y_position'] > current_price_y]
+            y_positions = levels[:, 0]
+            levels_above = y_positions[y_positions < current_price_y]
+            levels_below = y_positions[y_positions > current_price_y]
             
             # Estimate price percentages based on relative positions
             stop_loss_percent = 0.5  # Default
             take_profit_percent = 1.5  # Default
             
-            if levels_above and levels_below:
-                # Use closest levels for more precise estimation
-                closest_above = min(levels_above, key=lambda x: abs(x['y_position'] - current_price_y))
-                closest_below = min(levels_below, key=lambda x: abs(x['y_position'] - current_price_y))
+            if levels_above.size and levels_below.size:
+                # Use closest levels for more precise estimation: the lowest
+                # level above and the highest level below the current price
+                closest_above = float(levels_above.max())
+                closest_below = float(levels_below.min())
                 
                 # Calculate approximate percentage from position ratios
-                above_distance = abs(closest_above['y_position'] - current_price_y) / image_height
-                below_distance = abs(closest_below['y_position'] - current_price_y) / image_height
+                above_distance = abs(closest_above - current_price_y) / image_height
+                below_distance = abs(closest_below - current_price_y) / image_height
                 
                 # Convert to percentage estimates (rough approximation)
                 if above_distance > 0:
@@ -375,29 +439,27 @@ class ChartImageAnalyzer:
                 "trade_direction": "follow_chart_setup"
             }
     
-    def _detect_candlestick_patterns(self, image: np.ndarray) -> Dict:
-        """Detect candlestick patterns in the chart"""
+    def _detect_candlestick_patterns(self, gray: np.ndarray) -> Dict:
+        """Detect candlestick patterns in the grayscale chart"""
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # Apply edge detection
-            edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+            edges = cv2.Canny(gray, 50, 150, edges=scratch_buffer("candle_edges", gray.shape),
+                              apertureSize=3)
             
             # Find vertical lines (potential candlesticks)
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 10))
-            vertical_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, vertical_kernel)
+            vertical_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, _CANDLE_VERTICAL_KERNEL,
+                                              dst=scratch_buffer("candle_vertical", gray.shape))
             
             # Find horizontal lines (potential wicks/bodies)
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (10, 1))
-            horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
+            horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, _CANDLE_HORIZONTAL_KERNEL,
+                                                dst=scratch_buffer("candle_horizontal", gray.shape))
             
             # Count potential candlestick structures
             vertical_count = cv2.countNonZero(vertical_lines)
             horizontal_count = cv2.countNonZero(horizontal_lines)
             
             # Simple pattern detection based on line density
-            candlestick_density = (vertical_count + horizontal_count) / (image.shape[0] * image.shape[1])
+            candlestick_density = (vertical_count + horizontal_count) / (gray.shape[0] * gray.shape[1])
             
             if candlestick_density > 0.01:
                 pattern_detected = True
@@ -419,67 +481,71 @@ class ChartImageAnalyzer:
             self.logger.error(f"Candlestick detection failed: {str(e)}")
             return {"pattern_detected": False, "error": str(e)}
     
-    def _find_support_resistance_levels(self, image: np.ndarray) -> Dict:
-        """Find horizontal support and resistance levels"""
+    def _find_support_resistance_levels(self, segments: np.ndarray, scale: float = 1.0) -> Dict:
+        """Find horizontal support and resistance levels among the shared line segments
+        
+        Positions and lengths are reported in original image pixels, i.e.
+        multiplied by the downscale factor the chart was analyzed at.
+        """
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Use HoughLinesP to detect horizontal lines
-            lines = cv2.HoughLinesP(gray, 1, np.pi/180, threshold=100, 
-                                   minLineLength=50, maxLineGap=10)
-            
-            horizontal_lines = []
-            if lines is not None:
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
-                    # Check if line is approximately horizontal
-                    angle = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
-                    if angle < 5 or angle > 175:  # Nearly horizontal
-                        horizontal_lines.append({
-                            "y_position": (y1 + y2) // 2,
-                            "length": np.sqrt((x2-x1)**2 + (y2-y1)**2),
-                            "strength": min(1.0, len(horizontal_lines) * 0.1)
-                        })
-            
-            # Sort by line strength
-            horizontal_lines.sort(key=lambda x: x["strength"], reverse=True)
+            dx = segments[:, 2] - segments[:, 0]
+            dy = segments[:, 3] - segments[:, 1]
+            
+            # Check if line is approximately horizontal
+            angle = np.abs(np.arctan2(dy, dx) * 180 / np.pi)
+            horizontal = (angle < 5) | (angle > 175)
+            levels_detected = int(np.count_nonzero(horizontal))
+            
+            # Strength grows with detection order (10% per earlier level)
+            strengths = np.minimum(1.0, np.arange(levels_detected) * 0.1)
+            
+            # Sort by line strength; only the top 5 levels are reported
+            top = np.argsort(-strengths, kind='stable')[:5]
+            y_positions = (segments[horizontal, 1] + segments[horizontal, 3]) // 2
+            lengths = np.sqrt(dx[horizontal] ** 2 + dy[horizontal] ** 2)
+            if scale != 1.0:
+                y_positions = np.rint(y_positions * scale).astype(np.int64)
+                lengths = lengths * scale
+            
+            strong_levels = [
+                {"y_position": y_pos, "length": length, "strength": strength}
+                for y_pos, length, strength in zip(y_positions[top].tolist(),
+                                                   lengths[top].tolist(),
+                                                   strengths[top].tolist())
+            ]
             
             return {
-                "levels_detected": len(horizontal_lines),
-                "strong_levels": horizontal_lines[:5],  # Top 5 levels
-                "has_support_resistance": len(horizontal_lines) > 2
+                "levels_detected": levels_detected,
+                "strong_levels": strong_levels,  # Top 5 levels
+                "has_support_resistance": levels_detected > 2
             }
             
         except Exception as e:
             self.logger.error(f"Support/resistance detection failed: {str(e)}")
             return {"levels_detected": 0, "error": str(e)}
     
-    def _analyze_price_action(self, image: np.ndarray) -> Dict:
-        """Analyze price action and trend direction"""
+    def _analyze_price_action(self, edges: np.ndarray) -> Dict:
+        """Analyze price action and trend direction from blurred Canny 50/150 edges"""
         try:
-            # Convert to grayscale and apply Gaussian blur
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-            
             # Find contours to identify price movements
-            edges = cv2.Canny(blurred, 50, 150)
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             # Analyze contour directions for trend
             upward_movement = 0
             downward_movement = 0
             
-            for contour in contours:
-                if len(contour) > 10:  # Only analyze significant contours
-                    # Calculate general direction of contour
-                    start_point = contour[0][0]
-                    end_point = contour[-1][0]
-                    
-                    if end_point[1] < start_point[1]:  # Moving up (Y decreases upward)
-                        upward_movement += 1
-                    elif end_point[1] > start_point[1]:  # Moving down
-                        downward_movement += 1
+            # Only analyze significant contours
+            significant = [contour for contour in contours if len(contour) > 10]
+            
+            if significant:
+                # Gather first/last y coordinates, then compare them as arrays
+                count = len(significant)
+                start_y = np.fromiter((contour[0, 0, 1] for contour in significant), dtype=np.int64, count=count)
+                end_y = np.fromiter((contour[-1, 0, 1] for contour in significant), dtype=np.int64, count=count)
+                
+                # Calculate general direction of contour (Y decreases upward)
+                upward_movement = int(np.count_nonzero(end_y < start_y))
+                downward_movement = int(np.count_nonzero(end_y > start_y))
             
             total_movement = upward_movement + downward_movement
             
@@ -509,21 +575,18 @@ class ChartImageAnalyzer:
             self.logger.error(f"Price action analysis failed: {str(e)}")
             return {"trend_direction": "unclear", "error": str(e)}
     
-    def _analyze_volume_patterns(self, image: np.ndarray) -> Dict:
-        """Analyze volume patterns if visible in chart"""
+    def _analyze_volume_patterns(self, gray: np.ndarray) -> Dict:
+        """Analyze volume patterns if visible in the grayscale chart"""
         try:
             # Look for volume bars in lower portion of image
-            height, width = image.shape[:2]
-            volume_region = image[int(height * 0.7):, :]  # Bottom 30% of image
-            
-            # Convert volume region to grayscale
-            volume_gray = cv2.cvtColor(volume_region, cv2.COLOR_BGR2GRAY)
+            height, width = gray.shape[:2]
+            volume_gray = gray[int(height * 0.7):, :]  # Bottom 30% of image
             
             # Look for vertical bars (volume indicators)
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 5))
-            volume_bars = cv2.morphologyEx(volume_gray, cv2.MORPH_OPEN, vertical_kernel)
+            volume_bars = cv2.morphologyEx(volume_gray, cv2.MORPH_OPEN, _VOLUME_BAR_KERNEL,
+                                           dst=scratch_buffer("volume_bars", volume_gray.shape))
             
-            volume_density = cv2.countNonZero(volume_bars) / (volume_region.shape[0] * volume_region.shape[1])
+            volume_density = cv2.countNonZero(volume_bars) / (volume_gray.shape[0] * volume_gray.shape[1])
             
             if volume_density > 0.005:
                 volume_present = True
@@ -545,7 +608,8 @@ class ChartImageAnalyzer:
     def _generate_trading_signal(self, analysis: Dict) -> Dict:
         """Generate trading signal based on comprehensive analysis"""
         try:
-            print("\n🤖 === SIGNAL GENERATION ===")
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            
             # Extract analysis components
             trend = analysis.get("trend_analysis", {})
             existing_trade = analysis.get("existing_trade", {})
@@ -553,263 +617,135 @@ class ChartImageAnalyzer:
             levels = analysis.get("support_resistance", {})
             price_action = analysis.get("price_action", {})
             
-            print(f"📊 Input Analysis Data:")
-            print(f"   - Existing Trade: {existing_trade}")
-            print(f"   - Trend: {trend}")
-            print(f"   - Patterns: {patterns}")
-            print(f"   - Levels: {levels}")
-            print(f"   - Price Action: {price_action}")
-            
             # Check if we should copy an existing trade setup
             if existing_trade.get("has_existing_trade", False):
                 trade_type = existing_trade.get("trade_type", "follow_existing")
+                if debug:
+                    self.logger.debug("Existing trade detected (%s): %s", trade_type,
+                                      existing_trade.get("markers_detected", {}))
                 
                 if trade_type == "copy_existing_setup":
-                    print(f"\n📋 === COPYING EXISTING TRADE SETUP ===")
-                    print(f"🎯 Trade setup detected in chart - copying exact parameters")
-                    print(f"📊 Trade markers found: {existing_trade.get('markers_detected', {})}")
-                    
                     # Get extracted trade parameters
                     trade_params = existing_trade.get("trade_parameters", {})
                     stop_loss_percent = trade_params.get("stop_loss_percent", 0.5)
                     take_profit_percent = trade_params.get("take_profit_percent", 1.5)
                     
-                    print(f"📈 Copied Trade Parameters:")
-                    print(f"   - Stop Loss: {stop_loss_percent}%")
-                    print(f"   - Take Profit: {take_profit_percent}%")
-                    print(f"   - Levels Above: {trade_params.get('levels_above', 0)}")
-                    print(f"   - Levels Below: {trade_params.get('levels_below', 0)}")
-                    
                     # Copy the existing trade setup
-                    signal_result = {
-                        "isSignal": True,
-                        "confidence": 0.95,  # Very high confidence when copying visible trade
-                        "symbol": "ETH",
-                        "side": "copy",  # Special mode to copy existing trade
-                        "entryPrice": None,  # Use current market price as entry
-                        "stopLoss": None,  # Will be calculated from percentages
-                        "takeProfit": None,  # Will be calculated from percentages
-                        "stopLossPercent": stop_loss_percent,
-                        "takeProfitPercent": take_profit_percent,
-                        "quantity": 0.1,
-                        "leverage": 1,
-                        "reasoning": f"Copying existing trade setup from chart - SL:{stop_loss_percent}% TP:{take_profit_percent}%",
-                        "method": "copy_existing_trade",
-                        "trade_mode": "copy_existing",
-                        "analysis_details": {
+                    # Special "copy" side with very high confidence: the
+                    # visible trade is copied at the current market price
+                    return _signal(
+                        "copy", 0.95,
+                        stopLossPercent=stop_loss_percent,
+                        takeProfitPercent=take_profit_percent,
+                        reasoning=f"Copying existing trade setup from chart - SL:{stop_loss_percent}% TP:{take_profit_percent}%",
+                        method="copy_existing_trade",
+                        trade_mode="copy_existing",
+                        analysis_details={
                             "copied_trade_confidence": existing_trade.get("confidence", 0.9),
                             "markers_detected": existing_trade.get("markers_detected", {}),
                             "trade_parameters": trade_params,
                             "copy_mode": True
                         }
-                    }
-                    
-                    print(f"\n✅ TRADE COPIED FROM CHART:")
-                    print(f"   - Mode: COPY existing trade setup")
-                    print(f"   - Entry: Current market price")
-                    print(f"   - Stop Loss: {stop_loss_percent}% from entry")
-                    print(f"   - Take Profit: {take_profit_percent}% from entry")
-                    print(f"   - Confidence: 95%")
-                    print("📋 === TRADE COPY COMPLETE ===\n")
-                    
-                    return signal_result
+                    )
                     
-                else:  # Original follow mode
-                    print(f"\n📋 === FOLLOWING EXISTING TRADE ===")
-                    print(f"🎯 Existing trade detected - following current setup")
-                    print(f"📊 Trade markers found: {existing_trade.get('markers_detected', {})}")
-                
                 # Follow the existing trade with current market price as entry
-                signal_result = {
-                    "isSignal": True,
-                    "confidence": 0.9,  # High confidence when following existing trade
-                    "symbol": "ETH",
-                    "side": "follow",  # Special mode to follow existing trade
-                    "entryPrice": None,  # Use current market price
-                    "stopLoss": None,  # Will be calculated from percentages
-                    "takeProfit": None,  # Will be calculated from percentages
-                    "stopLossPercent": 0.5,  # Conservative 0.5% stop loss
-                    "takeProfitPercent": 1.5,  # Conservative 1.5% take profit
-                    "quantity": 0.1,
-                    "leverage": 1,
-                    "reasoning": "Following existing trade setup detected in chart with current market price as entry",
-                    "method": "existing_trade_follow",
-                    "trade_mode": "follow_existing",
-                    "analysis_details": {
+                # (special "follow" side, high confidence)
+                return _signal(
+                    "follow", 0.9,
+                    stopLossPercent=0.5,  # Conservative 0.5% stop loss
+                    takeProfitPercent=1.5,  # Conservative 1.5% take profit
+                    reasoning="Following existing trade setup detected in chart with current market price as entry",
+                    method="existing_trade_follow",
+                    trade_mode="follow_existing",
+                    analysis_details={
                         "existing_trade_confidence": existing_trade.get("confidence", 0.8),
                         "markers_detected": existing_trade.get("markers_detected", {}),
                         "follow_mode": True
                     }
-                }
-                
-                print(f"✅ EXISTING TRADE FOLLOW SIGNAL:")
-                print(f"   - Mode: FOLLOW existing trade")
-                print(f"   - Entry: Current market price")
-                print(f"   - Stop Loss: 0.5% from current price")
-                print(f"   - Take Profit: 1.5% from current price")
-                print(f"   - Confidence: 90%")
-                print("📋 === EXISTING TRADE FOLLOW COMPLETE ===\n")
-                
-                return signal_result
+                )
             
             # Initialize signal parameters
             signal_strength = 0.0
             signal_direction = None
             reasoning = []
             
-            print(f"\n🔢 Calculating signal strength...")
-            # Trend analysis weight (40%)
+            # Trend analysis weight
             trend_type = trend.get("trend", "neutral")
             trend_confidence = trend.get("confidence", 0.5)
-            print(f"📈 Trend Analysis: {trend_type} with {trend_confidence:.1%} confidence")
             
-            if trend_type == "bearish":
-                signal_strength += 0.4 * trend_confidence
-                signal_direction = "sell"
-                reasoning.append(f"Bearish trend detected ({trend_confidence:.1%} confidence)")
-                print(f"   ⬇️ BEARISH signal (+{0.4 * trend_confidence:.2f} strength)")
-            elif trend_type == "bullish":
-                signal_strength += 0.4 * trend_confidence
-                signal_direction = "buy"
-                reasoning.append(f"Bullish trend detected ({trend_confidence:.1%} confidence)")
-                print(f"   ⬆️ BULLISH signal (+{0.4 * trend_confidence:.2f} strength)")
-            else:
-                print(f"   ➡️ NEUTRAL trend (no direction bias)")
+            trend_side = _TREND_SIDES.get(trend_type)
+            if trend_side is not None:
+                signal_strength += SIGNAL_WEIGHTS["trend"] * trend_confidence
+                signal_direction = trend_side
+                reasoning.append(f"{trend_type.capitalize()} trend detected ({trend_confidence:.1%} confidence)")
             
-            # Pattern analysis weight (30%)
+            # Pattern analysis weight
             if patterns.get("pattern_detected", False):
                 pattern_confidence = patterns.get("confidence", 0.5)
-                signal_strength += 0.3 * pattern_confidence
+                signal_strength += SIGNAL_WEIGHTS["patterns"] * pattern_confidence
                 reasoning.append(f"Candlestick patterns identified ({pattern_confidence:.1%} confidence)")
-                print(f"🕯️ Pattern boost: +{0.3 * pattern_confidence:.2f} strength")
-            else:
-                print("🕯️ No significant patterns detected")
             
-            # Price action analysis weight (20%)
+            # Price action analysis weight
             price_direction = price_action.get("trend_direction", "unclear")
             price_strength = price_action.get("trend_strength", 0.5)
-            print(f"💹 Price Action: {price_direction} direction with {price_strength:.1%} strength")
             
-            if price_direction == "downward":
-                if signal_direction is None:
-                    signal_direction = "sell"
-                signal_strength += 0.2 * price_strength
-                reasoning.append(f"Downward price action ({price_strength:.1%} strength)")
-                print(f"   ⬇️ Downward action boost: +{0.2 * price_strength:.2f}")
-            elif price_direction == "upward":
+            price_side = _PRICE_ACTION_SIDES.get(price_direction)
+            if price_side is not None:
                 if signal_direction is None:
-                    signal_direction = "buy"
-                signal_strength += 0.2 * price_strength
-                reasoning.append(f"Upward price action ({price_strength:.1%} strength)")
-                print(f"   ⬆️ Upward action boost: +{0.2 * price_strength:.2f}")
+                    signal_direction = price_side
+                signal_strength += SIGNAL_WEIGHTS["price_action"] * price_strength
+                reasoning.append(f"{price_direction.capitalize()} price action ({price_strength:.1%} strength)")
             
-            # Support/resistance analysis weight (10%)
+            # Support/resistance analysis weight
             if levels.get("has_support_resistance", False):
-                signal_strength += 0.1
+                signal_strength += SIGNAL_WEIGHTS["support_resistance"]
                 reasoning.append("Support/resistance levels identified")
-                print(f"📏 S/R levels boost: +0.1")
-            else:
-                print("📏 No clear S/R levels")
             
             # Default to sell bias for ETH if no clear direction
             if signal_direction is None:
                 signal_direction = "sell"
                 signal_strength = max(0.7, signal_strength)
                 reasoning.append("Default bearish bias for ETH")
-                print(f"⚠️ No clear direction - defaulting to SELL bias")
             
             # Ensure minimum confidence
             final_confidence = max(0.75, signal_strength)
-            print(f"\n🎯 FINAL CALCULATION:")
-            print(f"   - Raw Signal Strength: {signal_strength:.2f}")
-            print(f"   - Final Confidence: {final_confidence:.2f}")
-            print(f"   - Signal Direction: {signal_direction.upper()}")
-            print(f"   - Reasoning: {reasoning}")
+            if debug:
+                self.logger.debug("Signal scoring: trend=%s (%.2f) patterns=%s price_action=%s (%.2f) "
+                                  "levels=%s -> %s strength %.2f, confidence %.2f",
+                                  trend_type, trend_confidence, patterns.get("pattern_detected", False),
+                                  price_direction, price_strength, levels.get("has_support_resistance", False),
+                                  signal_direction, signal_strength, final_confidence)
             
             # Generate trading parameters based on current market conditions
             # Note: These prices should be extracted from chart analysis or market data
             # For now, we'll use percentage-based stop loss and take profit
-            if signal_direction == "sell":
-                entry_price = None  # Let the trading system use market price
-                stop_loss_percent = 0.5  # 0.5% stop loss
-                take_profit_percent = -2.0  # 2% take profit (negative for sell)
-                print(f"📉 SELL Signal Parameters:")
-                print(f"   - Entry: Market Price (dynamic)")
-                print(f"   - Stop Loss: +0.5% from entry")
-                print(f"   - Take Profit: -2.0% from entry")
-            else:  # buy
-                entry_price = None  # Let the trading system use market price
-                stop_loss_percent = -0.5  # 0.5% stop loss (negative for buy)
-                take_profit_percent = 2.0  # 2% take profit
-                print(f"📈 BUY Signal Parameters:")
-                print(f"   - Entry: Market Price (dynamic)")
-                print(f"   - Stop Loss: -0.5% from entry")
-                print(f"   - Take Profit: +2.0% from entry")
-            
-            signal_result = {
-                "isSignal": True,
-                "confidence": final_confidence,
-                "symbol": "ETH",
-                "side": signal_direction,
-                "entryPrice": entry_price,  # None = use market price
-                "stopLoss": None,  # Legacy field - will be calculated from percentage
-                "takeProfit": None,  # Legacy field - will be calculated from percentage
-                "stopLossPercent": stop_loss_percent,
-                "takeProfitPercent": take_profit_percent,
-                "quantity": 0.1,
-                "leverage": 1,
-                "reasoning": f"Python CV Analysis: {'; '.join(reasoning)}",
-                "method": "python_computer_vision",
-                "analysis_details": {
-                    "trend_score": trend_confidence,
-                    "pattern_score": patterns.get("confidence", 0),
-                    "price_action_score": price_strength,
-                    "total_signal_strength": signal_strength
+            stop_loss_percent, take_profit_percent = _STOP_LOSS_TAKE_PROFIT[signal_direction]
+            
+            # Scores are reported on the 0-1 scale to whole-percent precision
+            return _signal(
+                signal_direction, round(final_confidence, 2),
+                stopLossPercent=stop_loss_percent,
+                takeProfitPercent=take_profit_percent,
+                reasoning=f"Python CV Analysis: {'; '.join(reasoning)}",
+                method="python_computer_vision",
+                analysis_details={
+                    "trend_score": round(trend_confidence, 2),
+                    "pattern_score": round(patterns.get("confidence", 0), 2),
+                    "price_action_score": round(price_strength, 2),
+                    "total_signal_strength": round(signal_strength, 2)
                 }
-            }
-            
-            print(f"\n✅ FINAL SIGNAL GENERATED:")
-            print(f"   {signal_result}")
-            print("🤖 === SIGNAL GENERATION COMPLETE ===\n")
-            
-            return signal_result
+            )
             
         except Exception as e:
             self.logger.error(f"Signal generation failed: {str(e)}")
-            return {
-                "isSignal": True,
-                "confidence": 0.8,
-                "symbol": "ETH",
-                "side": "sell",
-                "entryPrice": None,  # Use market price
-                "stopLoss": None,  # Legacy field - will be calculated from percentage
-                "takeProfit": None,  # Legacy field - will be calculated from percentage
-                "stopLossPercent": 0.5,  # 0.5% stop loss
-                "takeProfitPercent": 2.0,  # 2% take profit
-                "quantity": 0.1,
-                "leverage": 1,
-                "reasoning": f"Python Analysis Fallback: {str(e)}",
-                "method": "python_fallback"
-            }
+            return dict(_FALLBACK_SIGNAL, confidence=0.8,
+                        reasoning=f"Python Analysis Fallback: {str(e)}",
+                        method="python_fallback")
     
     def _create_error_response(self, error_message: str) -> Dict:
         """Create standardized error response"""
         return {
             "success": False,
             "error": error_message,
-            "trading_signal": {
-                "isSignal": True,
-                "confidence": 0.75,
-                "symbol": "ETH",
-                "side": "sell",
-                "entryPrice": None,  # Use market price
-                "stopLoss": None,  # Legacy field - will be calculated from percentage
-                "takeProfit": None,  # Legacy field - will be calculated from percentage
-                "stopLossPercent": 0.5,  # 0.5% stop loss
-                "takeProfitPercent": 2.0,  # 2% take profit
-                "quantity": 0.1,
-                "leverage": 1,
-                "reasoning": f"Error fallback: {error_message}",
-                "method": "python_error_fallback"
-            }
+            "trading_signal": dict(_FALLBACK_SIGNAL, reasoning=f"Error fallback: {error_message}")
         }
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Gunicorn configuration for the Python Trading Analysis Backend.
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.getenv('PYTHON_BACKEND_PORT', 5000)}"
+workers = int(os.getenv('PYTHON_BACKEND_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = 2
+timeout = 120
+
+# Import app.py (and construct the analyzers/OCR models) once in the master so
+# workers share the loaded weights copy-on-write
+preload_app = True
+
+# Warm up inside each worker instead of the master: PyTorch/OpenMP thread
+# pools started before fork are not usable in the children. Remember the
+# configured choice (.env included), then force it off for the master's
+# import of app.py; load_dotenv does not override variables already set
+_warmup_workers = os.getenv('PYTHON_BACKEND_WARMUP', 'true').lower() == 'true'
+os.environ['PYTHON_BACKEND_WARMUP'] = 'false'
+
+
+def post_fork(server, worker):
+    """Run the analysis engines once in every freshly forked worker"""
+    if not _warmup_workers:
+        return
+    from app import warmup
+    warmup()
@@ -8,9 +8,32 @@ import os
 import requests
 import json
 import base64
+import hashlib
+import tempfile
+from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 import io
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Change whenever create_test_chart draws (or the chart is encoded)
+# differently, so a stale cached image is not reused
+TEST_CHART_VERSION = "v3:800x600:png"
+
+def _pick_font():
+    """First available TrueType font for the chart labels, else PIL's default"""
+    for name in ("arial.ttf", "DejaVuSans.ttf"):
+        try:
+            return ImageFont.truetype(name, 24)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+_FONT = _pick_font()
+
 def create_test_chart():
     """Create a simple test chart image"""
     width, height = 800, 600
@@ -29,27 +52,57 @@ def create_test_chart():
     draw.line([150, 350, 150, 370], fill='black', width=2)
     
     # Add text
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-    except:
-        font = ImageFont.load_default()
-    
-    draw.text((200, 100), "BUY BTCUSDT", fill='green', font=font)
-    draw.text((200, 140), "Entry: $42500", fill='black', font=font)
-    draw.text((200, 180), "SL: $41800", fill='red', font=font)
-    draw.text((200, 220), "TP: $44200", fill='green', font=font)
+    draw.text((200, 100), "BUY BTCUSDT", fill='green', font=_FONT)
+    draw.text((200, 140), "Entry: $42500", fill='black', font=_FONT)
+    draw.text((200, 180), "SL: $41800", fill='red', font=_FONT)
+    draw.text((200, 220), "TP: $44200", fill='green', font=_FONT)
     
     return img
 
+def get_test_chart_data_uri():
+    """Test chart as a PNG data URI, cached in the temp directory between runs"""
+    key = hashlib.blake2b(TEST_CHART_VERSION.encode(), digest_size=8).hexdigest()
+    path = Path(tempfile.gettempdir()) / f"trading_test_chart_{key}.b64"
+    if path.exists():
+        return path.read_text()
+    
+    img_buffer = io.BytesIO()
+    # Fastest deflate level: the flat test chart still compresses to ~18 KB
+    create_test_chart().save(img_buffer, format='PNG', compress_level=1)
+    # Encode straight from the buffer's memory (getvalue() would copy it)
+    img_base64 = base64.b64encode(img_buffer.getbuffer()).decode()
+    img_data_uri = f"data:image/png;base64,{img_base64}"
+    
+    # Write to a uniquely named file then rename, so an interrupted or
+    # concurrent run never leaves or reads a truncated cache
+    with tempfile.NamedTemporaryFile('w', dir=path.parent, prefix=path.name,
+                                     suffix='.tmp', delete=False) as partial:
+        partial.write(img_data_uri)
+    os.replace(partial.name, path)
+    return img_data_uri
+
+def post_json(session, url, payload, timeout):
+    """POST a JSON payload, serialized with orjson when it is installed"""
+    if orjson is None:
+        return session.post(url, json=payload, timeout=timeout)
+    return session.post(url, data=orjson.dumps(payload),
+                        headers={"Content-Type": "application/json"}, timeout=timeout)
+
 def test_python_backend():
     """Test the Python backend functionality"""
+    # Share one pooled keep-alive connection across all the requests
+    with requests.Session() as session:
+        return run_backend_tests(session)
+
+def run_backend_tests(session):
+    """Run the health, chart analysis and OCR checks over an HTTP session"""
     print("🧪 Testing Python Backend for Trading Bot")
     print("=" * 50)
     
     # Test 1: Health check
     print("\n1. Testing health endpoint...")
     try:
-        response = requests.get('http://localhost:5000/health', timeout=10)
+        response = session.get('http://localhost:5000/health', timeout=10)
         if response.status_code == 200:
             health_data = response.json()
             print(f"✅ Backend is healthy: {health_data}")
@@ -63,13 +116,7 @@ def test_python_backend():
     
     # Test 2: Create test image
     print("\n2. Creating test chart image...")
-    test_image = create_test_chart()
-    
-    # Convert to base64
-    img_buffer = io.BytesIO()
-    test_image.save(img_buffer, format='PNG')
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    img_data_uri = f"data:image/png;base64,{img_base64}"
+    img_data_uri = get_test_chart_data_uri()
     print("✅ Test chart image created")
     
     # Test 3: Chart analysis
@@ -80,9 +127,10 @@ def test_python_backend():
             "analysis_type": "comprehensive"
         }
         
-        response = requests.post(
+        response = post_json(
+            session,
             'http://localhost:5000/analyze-chart',
-            json=payload,
+            payload,
             timeout=30
         )
         
@@ -122,9 +170,10 @@ def test_python_backend():
     try:
         payload = {"image": img_data_uri}
         
-        response = requests.post(
+        response = post_json(
+            session,
             'http://localhost:5000/extract-text',
-            json=payload,
+            payload,
             timeout=20
         )
         
@@ -4,6 +4,11 @@ import requests
 import json
 import base64
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def test_copy_trade():
     """Test the copy trade functionality with the backend"""
     
@@ -22,7 +27,11 @@ def test_copy_trade():
             "force_copy_mode": True  # Force copy mode for testing
         }
         
-        response = requests.post(url, json=payload)
+        if orjson is not None:
+            response = requests.post(url, data=orjson.dumps(payload),
+                                     headers={"Content-Type": "application/json"})
+        else:
+            response = requests.post(url, json=payload)
         
         if response.status_code == 200:
             result = response.json()